@@ -0,0 +1,35 @@
+import importlib
+
+# Public names resolve lazily (PEP 562) so that importing the package, or running a
+# CLI from a snapshot, does not pull in pandas/scipy until something needs them.
+# The shared metrics registry is not re-exported: its name is also the submodule's, so
+# use `from allocation_engine.metrics import metrics`.
+_EXPORTS = {
+    "run_cli": "allocation_engine.cli",
+    "HospitalTable": "allocation_engine.data",
+    "compact_predictions": "allocation_engine.data",
+    "read_predictions": "allocation_engine.data",
+    "resolve_predictions": "allocation_engine.data",
+    "RESOURCES": "allocation_engine.engine",
+    "AllocationEngine": "allocation_engine.engine",
+    "parse_date": "allocation_engine.engine",
+    "parse_day": "allocation_engine.engine",
+    "Metrics": "allocation_engine.metrics",
+    "RULE_SETS": "allocation_engine.rules",
+    "RuleSet": "allocation_engine.rules",
+    "get_rule_set": "allocation_engine.rules",
+    "AllocationService": "allocation_engine.service",
+    "BedLedger": "allocation_engine.service",
+    "HospitalIndex": "allocation_engine.spatial",
+    "normalize_name": "allocation_engine.spatial",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'allocation_engine' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
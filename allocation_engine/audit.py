@@ -0,0 +1,163 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import warnings
+
+import numpy as np
+
+# === Audit Log Format ===
+# 16-byte header (magic + record size), then fixed-width little-endian records.
+# The file is append-only and can be memory-mapped with read_audit_log() for replay.
+MAGIC = b"DNGAUDT1"
+HEADER_SIZE = 16
+
+VERDICTS = ["Mild", "Moderate", "Severe", "Very Severe", "Normal"]
+RESOURCE_TYPES = ["General Bed", "ICU"]
+AVAILABILITY = {"No": 0, "Yes": 1, "Unknown": -1}
+
+# status codes
+OK = 0
+INVALID_DATE = 1
+NOT_IN_PREDICTIONS = 2
+NOT_IN_DISTANCE_MATRIX = 3
+NO_CAPACITY = 4
+STATUS_NAMES = ["ok", "invalid_date", "not_in_predictions", "not_in_distance_matrix", "no_capacity"]
+
+AUDIT_DTYPE = np.dtype([
+    ("timestamp", "<f8"),       # time.time() at decision
+    ("latency_ns", "<i8"),      # allocate() wall time
+    ("year", "<i2"),
+    ("month", "i1"),
+    ("day", "i1"),
+    ("age", "<f4"),
+    ("weight", "<f4"),
+    ("platelet", "<i4"),
+    ("igg", "i1"),
+    ("igm", "i1"),
+    ("ns1", "i1"),
+    ("force_reroute", "i1"),
+    ("verdict", "i1"),          # index into VERDICTS, -1 unknown
+    ("resource", "i1"),         # index into RESOURCE_TYPES, -1 unknown
+    ("available", "i1"),        # at the tried hospital: 1 yes, 0 no, -1 unknown
+    ("status", "i1"),
+    ("tried", "<i4"),           # hospital code, -1 if not in the lookup table
+    ("assigned", "<i4"),        # hospital code, -1 if none
+    ("distance", "<f4"),        # km, NaN when not rerouted
+    ("hops", "<i2"),            # reroute candidates examined, 0 when assigned in place
+    ("_pad", "V2"),
+])
+
+
+def saturate(value, field):
+    # Clamp an integer into the range of an AUDIT_DTYPE field so one out-of-range input
+    # (e.g. a mistyped platelet count) cannot fail the whole batch
+    info = np.iinfo(AUDIT_DTYPE[field])
+    return min(max(int(value), info.min), info.max)
+
+
+def _header():
+    return MAGIC + np.uint32(AUDIT_DTYPE.itemsize).tobytes() + b"\0" * (HEADER_SIZE - len(MAGIC) - 4)
+
+
+def _check_header(raw, path):
+    if raw[:len(MAGIC)] != MAGIC or np.frombuffer(raw[8:12], "<u4")[0] != AUDIT_DTYPE.itemsize:
+        raise ValueError(f"{path} is not an allocation audit log of this version")
+
+
+class AuditLog:
+    # append() only enqueues a tuple; a daemon thread packs batches and flushes them,
+    # so logging stays off the allocation hot path.
+    def __init__(self, path, hospital_names=(), batch_size=1024, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self.dropped = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER_SIZE), path)
+        self._file = open(path, "ab")
+        if not exists:
+            self._file.write(_header())
+            self._file.flush()
+
+        # Sidecar with the code tables so a replay does not need the engine
+        if hospital_names:
+            with open(path + ".json", "w") as f:
+                json.dump({"hospitals": list(hospital_names), "verdicts": VERDICTS,
+                           "resources": RESOURCE_TYPES}, f)
+
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, record):
+        # record: tuple in AUDIT_DTYPE field order (without the pad field)
+        self._queue.put(record + (b"",))
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._file.write(self._pack(batch))
+                self._file.flush()
+
+    def _pack(self, batch):
+        # A record that does not fit AUDIT_DTYPE is dropped on its own; the writer thread
+        # keeps running and the rest of the batch is still written
+        try:
+            return np.array(batch, dtype=AUDIT_DTYPE).tobytes()
+        except (OverflowError, ValueError, TypeError):
+            packed = []
+            for record in batch:
+                try:
+                    packed.append(np.array([record], dtype=AUDIT_DTYPE).tobytes())
+                except (OverflowError, ValueError, TypeError) as exc:
+                    self.dropped += 1
+                    warnings.warn(f"Audit record dropped ({exc}): {record[:-1]}", RuntimeWarning)
+            return b"".join(packed)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_audit_log(path):
+    # Zero-copy view of every record written so far
+    with open(path, "rb") as f:
+        _check_header(f.read(HEADER_SIZE), path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // AUDIT_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=AUDIT_DTYPE)
+    return np.memmap(path, dtype=AUDIT_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
@@ -0,0 +1,28 @@
+# Shared manual-input loop for the allocation CLIs
+def prompt_patient():
+    hospital = input("Enter Hospital Name: ").strip()
+    date_str = input("Enter Date (YYYY-MM-DD): ").strip()
+    age = int(input("Enter Age: "))
+    weight = float(input("Enter Weight (kg): "))
+    platelet = int(input("Enter Platelet Count: "))
+    igg = int(input("Enter IgG (0 or 1): "))
+    igm = int(input("Enter IgM (0 or 1): "))
+    ns1 = int(input("Enter NS1 (0 or 1): "))
+    return hospital, date_str, age, weight, platelet, igg, igm, ns1
+
+
+def print_result(result, heading="--- ALLOCATION RESULT ---"):
+    print(f"\n{heading}")
+    for k, v in result.items():
+        print(f"{k}: {v}")
+
+
+def run_cli(engine, title, heading="--- ALLOCATION RESULT ---", **options):
+    # engine may be a zero-argument factory so loading happens after the prompts
+    print(title)
+    patient = prompt_patient()
+    if callable(engine):
+        engine = engine()
+    result = engine.allocate(*patient, **options)
+    print_result(result, heading)
+    return result
@@ -0,0 +1,141 @@
+import hashlib
+import os
+
+import numpy as np
+
+from allocation_engine.spatial import normalize_name
+
+COUNT_COLUMNS = ['Total Admitted till date', 'Admitted Patient in present', 'Beds Occupied',
+                 'ICU Beds Occupied', 'Beds Total', 'ICU Beds Total']
+RATE_COLUMNS = ['Bed occupancy rate', 'ICU occupancy rate']
+
+
+def _int_dtype(lo, hi):
+    return np.int16 if np.iinfo(np.int16).min <= lo and hi <= np.iinfo(np.int16).max else np.int32
+
+
+def compact_counts(series):
+    # int16/int32 when every value is a whole number, float32 otherwise (keeps NaN)
+    import pandas as pd
+
+    values = pd.to_numeric(series, errors='coerce')
+    if len(values) and values.notna().all() and (values % 1 == 0).all():
+        return values.astype(_int_dtype(values.min(), values.max()))
+    return values.astype(np.float32)
+
+
+# === Hospital Lookup Table ===
+# Names are normalized once here; everything downstream works on integer codes.
+class HospitalTable:
+    def __init__(self, keys, names):
+        self.keys = list(keys)
+        self.names = list(names)
+        self.positions = {k: i for i, k in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, name):
+        return self.positions.get(normalize_name(name))
+
+
+def compact_predictions(pred_df, hospital_keys=(), hospital_names=()):
+    # Returns (frame, HospitalTable). 'Hospital' becomes an integer code; the given
+    # hospital_keys (e.g. the spatial index order) take the first codes.
+    import pandas as pd
+
+    pred_df = pred_df.rename(columns=lambda c: str(c).strip())
+    if "Year" not in pred_df.columns or "Month" not in pred_df.columns:
+        raise ValueError("'Year' and 'Month' columns not found in the prediction dataset")
+
+    raw = pred_df["Hospital"].astype(str).str.strip()
+    inverse, uniques = pd.factorize(raw)
+    unique_keys = [normalize_name(u) for u in uniques]
+
+    keys = list(hospital_keys)
+    names = list(hospital_names) or list(keys)
+    known = set(keys)
+    for key, name in zip(unique_keys, uniques):
+        if key not in known:
+            keys.append(key)
+            names.append(name)
+            known.add(key)
+    table = HospitalTable(keys, names)
+    # Prefer the spelling used in the predictions for display
+    for key, name in zip(unique_keys, uniques):
+        table.names[table.positions[key]] = name
+
+    code_map = np.array([table.positions[k] for k in unique_keys], dtype=np.int32)
+    compact = pd.DataFrame({
+        "Year": pred_df["Year"].astype(np.int16).to_numpy(),
+        "Month": pred_df["Month"].astype(np.int8).to_numpy(),
+        "Hospital": code_map[inverse].astype(_int_dtype(0, len(table))),
+    })
+    # Daily forecasts (one row per hospital per calendar day)
+    if "Day" in pred_df.columns:
+        compact.insert(2, "Day", pred_df["Day"].astype(np.int8).to_numpy())
+    for col in pred_df.columns:
+        if col in ("Year", "Month", "Day", "Hospital"):
+            continue
+        if col in COUNT_COLUMNS:
+            compact[col] = compact_counts(pred_df[col]).to_numpy()
+        elif col in RATE_COLUMNS or pd.api.types.is_numeric_dtype(pred_df[col]):
+            compact[col] = pd.to_numeric(pred_df[col], errors='coerce').astype(np.float32).to_numpy()
+    return compact, table
+
+
+def resolve_predictions(path, daily=None):
+    # Maps a monthly artifact name to its daily sibling written by `--daily`, e.g.
+    # rf_predictions_2026_2027_dynamic.xlsx -> rf_daily_predictions_2026_2027_dynamic.xlsx.
+    # daily=None picks the daily forecast when one exists (workbook or Parquet).
+    if daily is False:
+        return path
+    folder, name = os.path.split(path)
+    daily_path = os.path.join(folder, name.replace("_predictions_", "_daily_predictions_", 1))
+    if daily or daily_path == path:
+        return daily_path
+    stem, _ = os.path.splitext(daily_path)
+    return daily_path if os.path.exists(daily_path) or os.path.exists(f"{stem}.parquet") else path
+
+
+def _workbook_unchanged(parquet, path):
+    # True when the Parquet file was written together with the workbook as it is now.
+    # forecasting.output stamps the workbook's size, mtime and SHA-256 into the Parquet
+    # metadata; files without a stamp fall back to comparing modification times.
+    import json
+
+    st = os.stat(path)
+    try:
+        import pyarrow.parquet as pq
+
+        raw = (pq.read_schema(parquet).metadata or {}).get(b"source_workbook")
+    except ImportError:
+        raw = None
+    if raw is None:
+        return os.path.getmtime(parquet) >= st.st_mtime
+    stamp = json.loads(raw)
+    if stamp["size"] != st.st_size:
+        return False
+    if stamp["mtime_ns"] == st.st_mtime_ns:
+        return True
+    # Same size, different mtime (fresh clone, copy): compare contents
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() == stamp["sha256"]
+
+
+def read_predictions(path):
+    # The forecasting scripts write a Parquet artifact next to each workbook; use it
+    # when present so loading does not depend on parsing Excel, unless the workbook
+    # was replaced since (by hand or by a script that only writes Excel).
+    import pandas as pd
+
+    stem, ext = os.path.splitext(path)
+    if ext.lower() == ".parquet":
+        return pd.read_parquet(path)
+    parquet = f"{stem}.parquet"
+    if os.path.exists(parquet) and (not os.path.exists(path) or _workbook_unchanged(parquet, path)):
+        try:
+            return pd.read_parquet(parquet)
+        except ImportError:
+            pass
+    return pd.read_excel(path)
@@ -0,0 +1,293 @@
+import re
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from allocation_engine import audit, snapshot
+from allocation_engine.audit import AuditLog
+from allocation_engine.data import compact_predictions, read_predictions
+from allocation_engine.metrics import metrics
+from allocation_engine.rules import get_rule_set, lab_flag
+from allocation_engine.spatial import HospitalIndex, normalize_name
+
+# Resource type -> (occupied column, capacity column) in the prediction workbooks
+RESOURCES = {
+    "ICU": ("ICU Beds Occupied", "ICU Beds Total"),
+    "General Bed": ("Beds Occupied", "Beds Total"),
+}
+
+STAGE = "dengue_allocation_stage_seconds"
+
+
+def parse_day(date_input):
+    if isinstance(date_input, (date, datetime)):
+        return date_input.year, date_input.month, date_input.day
+    date_obj = datetime.strptime(str(date_input).strip(), "%Y-%m-%d")
+    return date_obj.year, date_obj.month, date_obj.day
+
+
+def parse_date(date_input):
+    return parse_day(date_input)[:2]
+
+
+# === Allocation Engine ===
+# Holds every index the hot path needs: (year, month) -> period row, or (year, month, day)
+# for daily forecasts, hospital code -> column, dense occupied/capacity arrays per
+# resource, and the spatial reroute index.
+# load() builds them from the prediction files with pandas; from_snapshot() restores
+# them from a NumPy-only snapshot so a cold CLI start never imports pandas.
+class AllocationEngine:
+    def __init__(self, hospitals, periods, present, occupied, capacity, hospital_index,
+                 rules="score", audit_log=None, quantile_levels=(), occupied_quantiles=None):
+        self.rules = get_rule_set(rules)
+        self.audit_log = audit_log
+        self.hospital_index = hospital_index
+        self.hospitals = hospitals
+        self.hospital_keys = hospitals.keys
+        self.hospital_positions = hospitals.positions
+        self.hospital_names = hospitals.names
+        self.periods = [tuple(p) for p in periods]
+        self.daily = bool(self.periods) and len(self.periods[0]) == 3
+        self.period_positions = {p: i for i, p in enumerate(self.periods)}
+        self.present = present
+        self.occupied = occupied
+        self.capacity = capacity
+        # Optional forecast quantiles: occupied_quantiles[resource][i] is the plane for
+        # quantile_levels[i], same (period, hospital) layout as `occupied`.
+        self.quantile_levels = tuple(float(q) for q in quantile_levels)
+        self.occupied_quantiles = occupied_quantiles or {}
+        # Optional shared BedLedger (see allocation_engine.service): beds handed out by
+        # any process sharing it count as occupied, and every assignment reserves one.
+        self.ledger = None
+        self.resource_positions = {r: i for i, r in enumerate(occupied)}
+
+    @classmethod
+    def from_predictions(cls, pred_df, hospital_index, rules="score", audit_log=None):
+        compact, hospitals = compact_predictions(pred_df, hospital_index.keys, hospital_index.names)
+
+        # Daily forecasts carry a 'Day' column; periods are then (year, month, day)
+        keys = ["Year", "Month", "Day"] if "Day" in compact.columns else ["Year", "Month"]
+        status = compact.groupby(keys + ["Hospital"])[
+            ['Beds Occupied', 'ICU Beds Occupied', 'Beds Total', 'ICU Beds Total']
+        ].mean()
+        parts = [status.index.get_level_values(i).to_numpy().astype(np.int32) for i in range(len(keys))]
+        code = parts[0] * 100 + parts[1] if len(keys) == 2 else parts[0] * 10000 + parts[1] * 100 + parts[2]
+        periods, rows = np.unique(code, return_inverse=True)
+        if len(keys) == 2:
+            periods = [(int(p // 100), int(p % 100)) for p in periods]
+        else:
+            periods = [(int(p // 10000), int(p // 100 % 100), int(p % 100)) for p in periods]
+        cols = status.index.get_level_values("Hospital").to_numpy().astype(np.intp)
+        shape = (len(periods), len(hospitals))
+
+        # float32 planes: exact for bed counts and NaN-safe for missing forecasts
+        present = np.zeros(shape, dtype=bool)
+        present[rows, cols] = True
+        occupied = {}
+        capacity = {}
+        for resource_type, (occ_col, cap_col) in RESOURCES.items():
+            occupied[resource_type] = np.full(shape, np.nan, dtype=np.float32)
+            occupied[resource_type][rows, cols] = status[occ_col].to_numpy(dtype=np.float32)
+            capacity[resource_type] = np.full(shape, np.nan, dtype=np.float32)
+            capacity[resource_type][rows, cols] = status[cap_col].to_numpy(dtype=np.float32)
+
+        # Quantile columns such as "ICU Beds Occupied q90" become extra planes
+        levels = None
+        for occ_col, _ in RESOURCES.values():
+            found = {int(m.group(1)) for m in (re.fullmatch(re.escape(occ_col) + r" q(\d+)", c) for c in compact.columns) if m}
+            levels = found if levels is None else levels & found
+        levels = sorted(levels)
+        occupied_quantiles = {}
+        if levels:
+            quantile_cols = [f"{occ_col} q{q}" for occ_col, _ in RESOURCES.values() for q in levels]
+            qstatus = compact.groupby(keys + ["Hospital"])[quantile_cols].mean()
+            for resource_type, (occ_col, _) in RESOURCES.items():
+                planes = np.full((len(levels),) + shape, np.nan, dtype=np.float32)
+                for i, q in enumerate(levels):
+                    planes[i, rows, cols] = qstatus[f"{occ_col} q{q}"].to_numpy(dtype=np.float32)
+                occupied_quantiles[resource_type] = planes
+
+        return cls(hospitals, periods, present, occupied, capacity, hospital_index, rules, audit_log,
+                   quantile_levels=[q / 100 for q in levels], occupied_quantiles=occupied_quantiles)
+
+    @classmethod
+    def load(cls, pred_path="rf_predictions_2026_2027_dynamic.xlsx", distance_path="distance matrix.csv",
+             coords_path="hospital coordinates.csv", rules="score", audit_path=None, snapshot_path=None):
+        # With snapshot_path, reuse the snapshot while its source files are unchanged and
+        # (re)write it otherwise.
+        engine = None
+        if snapshot_path:
+            sources = snapshot.source_signature(pred_path, distance_path, coords_path)
+            with metrics.timer(STAGE, stage="load_snapshot"):
+                engine = snapshot.load_snapshot(snapshot_path, cls, rules=rules, sources=sources)
+
+        if engine is None:
+            with metrics.timer(STAGE, stage="load"):
+                pred_df = read_predictions(pred_path)
+                hospital_index = HospitalIndex.from_files(distance_path, coords_path)
+            with metrics.timer(STAGE, stage="index"):
+                engine = cls.from_predictions(pred_df, hospital_index, rules=rules)
+            if snapshot_path:
+                snapshot.save_snapshot(engine, snapshot_path, sources=sources)
+
+        if audit_path:
+            engine.audit_log = AuditLog(audit_path, engine.hospital_names)
+        return engine
+
+    @classmethod
+    def from_snapshot(cls, path, rules="score"):
+        return snapshot.load_snapshot(path, cls, rules=rules)
+
+    def save_snapshot(self, path):
+        snapshot.save_snapshot(self, path)
+
+    def close(self):
+        if self.audit_log is not None:
+            self.audit_log.close()
+
+    def verdict(self, age, platelet, igg, igm, ns1):
+        verdict = self.rules.verdict(age, platelet, igg, igm, ns1)
+        return verdict, "ICU" if verdict in self.rules.icu_verdicts else "General Bed"
+
+    def quantile_plane(self, confidence):
+        # Lowest stored quantile that covers the requested confidence level
+        for i, q in enumerate(self.quantile_levels):
+            if q >= confidence - 1e-9:
+                return i
+        raise ValueError(f"No occupancy quantile at or above {confidence} "
+                         f"(available: {list(self.quantile_levels) or 'none'})")
+
+    def occupancy(self, period, resource_type, confidence=None):
+        # Forecast occupancy of every hospital for one period; with a confidence level it
+        # is taken from that forecast quantile.
+        if confidence is None:
+            return self.occupied[resource_type][period]
+        return self.occupied_quantiles[resource_type][self.quantile_plane(confidence), period]
+
+    def free(self, period, resource_type, confidence=None):
+        # Boolean availability of every hospital for one period, NaN counts as unavailable
+        occupied = self.occupancy(period, resource_type, confidence)
+        if self.ledger is not None:
+            occupied = occupied + self.ledger.reserved[self.resource_positions[resource_type], period]
+        with np.errstate(invalid="ignore"):
+            return self.capacity[resource_type][period] > occupied
+
+    def _reserve(self, period, resource_type, pos, confidence):
+        # Claims one bed in the ledger; False when another process took the last one first
+        if self.ledger is None:
+            return True
+        headroom = float(self.capacity[resource_type][period, pos]) - float(
+            self.occupancy(period, resource_type, confidence)[pos])
+        limit = int(np.ceil(headroom)) if headroom > 0 else 0
+        return self.ledger.reserve(self.resource_positions[resource_type], period, pos, limit)
+
+    def release(self, hospital, date_input, resource_type):
+        # Gives back a bed reserved by allocate(), e.g. on discharge. Takes the result's
+        # "Assigned Hospital", "Date" and "Resource Needed".
+        if self.ledger is None:
+            raise ValueError("Engine has no bed ledger")
+        year, month, day = parse_day(date_input)
+        period = self.period_positions.get((year, month, day) if self.daily else (year, month))
+        pos = self.hospital_positions.get(normalize_name(hospital))
+        if period is None or pos is None:
+            raise KeyError(f"No forecast for {hospital!r} on {date_input}")
+        self.ledger.release(self.resource_positions[resource_type], period, pos)
+
+    def allocate(self, hospital, date_input, age, weight, platelet, igg, igm, ns1, force_reroute=False,
+                 confidence=None):
+        # confidence: require the bed to be free at that forecast quantile, e.g. 0.9
+        start = time.perf_counter_ns()
+        if confidence is not None:
+            self.quantile_plane(confidence)
+        output, trace = self._allocate(hospital, date_input, age, weight, platelet, igg, igm, ns1, force_reroute,
+                                       confidence)
+        latency_ns = time.perf_counter_ns() - start
+        if metrics.enabled:
+            metrics.observe(STAGE, latency_ns / 1e9, stage="allocate")
+            metrics.count("dengue_allocation_decisions_total", status=audit.STATUS_NAMES[trace[0]])
+            metrics.observe("dengue_allocation_reroute_hops", trace[-1])
+        if self.audit_log is not None:
+            self._audit(output, trace, age, weight, platelet, igg, igm, ns1, force_reroute, latency_ns)
+        return output
+
+    def _audit(self, output, trace, age, weight, platelet, igg, igm, ns1, force_reroute, latency_ns):
+        status, year, month, day, tried, assigned, distance, hops = trace
+        verdict = output.get("Verdict")
+        resource = output.get("Resource Needed")
+        self.audit_log.append((
+            time.time(), latency_ns, year, month, day, age, weight, audit.saturate(platelet, "platelet"),
+            lab_flag(igg), lab_flag(igm), lab_flag(ns1), int(force_reroute),
+            audit.VERDICTS.index(verdict) if verdict in audit.VERDICTS else -1,
+            audit.RESOURCE_TYPES.index(resource) if resource in audit.RESOURCE_TYPES else -1,
+            audit.AVAILABILITY.get(output.get("Available at Current Hospital"), -1),
+            status, tried, assigned, distance, audit.saturate(hops, "hops"),
+        ))
+
+    def _allocate(self, hospital, date_input, age, weight, platelet, igg, igm, ns1, force_reroute, confidence):
+        # Returns the result dict and a (status, year, month, day, tried, assigned, distance,
+        # hops) trace in hospital codes for the audit log. force_reroute treats the selected
+        # hospital as full (allocation2.py simulator).
+        try:
+            year, month, day = parse_day(date_input)
+        except ValueError:
+            return {"Error": "Invalid date format. Use YYYY-MM-DD"}, (audit.INVALID_DATE, 0, 0, 0, -1, -1, np.nan, 0)
+        # Monthly forecasts cover the whole month and are recorded against its first day
+        if not self.daily:
+            day = 1
+
+        with metrics.timer(STAGE, stage="severity"):
+            verdict, resource_type = self.verdict(age, platelet, igg, igm, ns1)
+        output = {
+            "Date": f"{year:04d}-{month:02d}-{day:02d}" if isinstance(date_input, (date, datetime)) else date_input,
+            "Verdict": verdict,
+            "Resource Needed": resource_type,
+            "Hospital Tried": hospital,
+        }
+        if confidence is not None:
+            output["Confidence"] = confidence
+
+        with metrics.timer(STAGE, stage="lookup"):
+            period = self.period_positions.get((year, month, day) if self.daily else (year, month))
+            pos = self.hospital_positions.get(normalize_name(hospital))
+            tried = -1 if pos is None else pos
+            found = period is not None and pos is not None and self.present[period, pos]
+            if found:
+                free = self.free(period, resource_type, confidence)
+
+        # Step 1: Check current hospital availability
+        if not found:
+            output["Available at Current Hospital"] = "Unknown"
+            output["Note"] = "Hospital not found in prediction data"
+            return output, (audit.NOT_IN_PREDICTIONS, year, month, day, tried, -1, np.nan, 0)
+
+        if force_reroute:
+            free[pos] = False
+        if free[pos] and self._reserve(period, resource_type, pos, confidence):
+            output["Assigned Hospital"] = hospital
+            output["Available at Current Hospital"] = "Yes"
+            output["Note"] = "Assigned at selected hospital"
+            return output, (audit.OK, year, month, day, tried, pos, 0.0, 0)
+        output["Available at Current Hospital"] = "No"
+
+        # Step 2: Try nearest hospitals using the spatial index
+        if pos >= len(self.hospital_index):
+            output["Note"] = "Hospital not found in distance matrix"
+            return output, (audit.NOT_IN_DISTANCE_MATRIX, year, month, day, tried, -1, np.nan, 0)
+
+        with metrics.timer(STAGE, stage="reroute"):
+            free = free[:len(self.hospital_index)]
+            while True:
+                alt_pos, alt_dist, hops = self.hospital_index.nearest_available(pos, free)
+                if not len(alt_pos) or self._reserve(period, resource_type, int(alt_pos[0]), confidence):
+                    break
+                free[alt_pos[0]] = False
+        if len(alt_pos):
+            output["Assigned Hospital"] = self.hospital_names[alt_pos[0]]
+            output["Distance (KM)"] = round(float(alt_dist[0]), 2)
+            output["Note"] = f"Redirected to nearest hospital with available {resource_type}"
+            return output, (audit.OK, year, month, day, tried, int(alt_pos[0]), float(alt_dist[0]), int(hops[0]))
+
+        output["Assigned Hospital"] = None
+        output["Note"] = "No nearby hospital has available resource"
+        return output, (audit.NO_CAPACITY, year, month, day, tried, -1, np.nan, len(self.hospital_index) - 1)
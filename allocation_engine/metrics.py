@@ -0,0 +1,205 @@
+import atexit
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# === Lightweight Metrics ===
+# Counters and histograms rendered in Prometheus text format. Disabled by default;
+# while disabled timer() hands back one shared nullcontext and count()/observe()
+# return immediately, so the hooks can stay on the hot path.
+#   DENGUE_METRICS_FILE=metrics.prom  -> enable and write the file at exit
+#   DENGUE_METRICS_PORT=9108          -> enable and serve GET /metrics
+# Child processes (e.g. AllocationService workers) only collect; the parent owns the
+# file and the port and merges what the children drain() into its own registry.
+SECONDS_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0)
+HOP_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+_NULL = nullcontext()
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.buckets = {}
+        self.help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def describe(self, name, help_text, buckets=None):
+        self.help[name] = help_text
+        if buckets is not None:
+            self.buckets[name] = tuple(buckets)
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        buckets = self.buckets.get(name, SECONDS_BUCKETS)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            hist[0][bisect.bisect_left(buckets, value)] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def drain(self):
+        # Hands over and resets everything recorded so far, for merge() in another process
+        with self._lock:
+            state = (self._counters, self._histograms)
+            self._counters, self._histograms = {}, {}
+        return state
+
+    def merge(self, state):
+        counters, histograms = state
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (counts, total, n) in histograms.items():
+                hist = self._histograms.get(key)
+                if hist is None:
+                    self._histograms[key] = [list(counts), total, n]
+                    continue
+                hist[0] = [a + b for a, b in zip(hist[0], counts)]
+                hist[1] += total
+                hist[2] += n
+
+    def timer(self, name, **labels):
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name, labels)
+
+    def timed(self, name, **labels):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (counts, total, n) in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, c in zip(self.buckets.get(name, SECONDS_BUCKETS) + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+metrics = Metrics()
+metrics.describe("dengue_allocation_stage_seconds", "Time spent per allocation stage")
+metrics.describe("dengue_allocation_decisions_total", "Allocation decisions by outcome")
+metrics.describe("dengue_allocation_reroute_hops", "Reroute candidates examined per decision", HOP_BUCKETS)
+metrics.describe("dengue_forecast_stage_seconds", "Time spent per forecasting stage")
+
+
+def _is_main_process():
+    # A spawned/forkserver child re-imports this module with the parent's environment;
+    # it must not bind the parent's port or overwrite the parent's file. Imports made
+    # while the child unpickles its start-up state happen before parent_process() is
+    # set, under multiprocessing's own `_inheriting` marker.
+    import multiprocessing
+
+    inheriting = getattr(multiprocessing.current_process(), "_inheriting", False)
+    return multiprocessing.parent_process() is None and not inheriting
+
+
+if os.environ.get("DENGUE_METRICS_FILE"):
+    metrics.enable()
+    if _is_main_process():
+        atexit.register(metrics.write, os.environ["DENGUE_METRICS_FILE"])
+if os.environ.get("DENGUE_METRICS_PORT"):
+    metrics.enable()
+    if _is_main_process():
+        metrics.serve(os.environ["DENGUE_METRICS_PORT"])
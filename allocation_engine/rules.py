@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+# A rule set maps lab results to a verdict and names the verdicts that need an ICU bed.
+RuleSet = namedtuple("RuleSet", ["verdict", "icu_verdicts"])
+
+
+def lab_flag(value):
+    # Lab flags arrive as 0/1 from the CLIs and as "Positive"/"Negative" from Streamlit
+    if isinstance(value, str):
+        return 1 if value.strip().lower() == "positive" else 0
+    return int(value)
+
+
+# === Severity Score (allocation.py, allocation2.py, allocation 3.py) ===
+def calculate_severity(age, platelet, igg, igm, ns1):
+    score = lab_flag(ns1) + lab_flag(igm) + 0.5 * lab_flag(igg)
+    score += 1 if age < 15 else 0
+    if platelet < 50000:
+        score += 3
+    elif platelet < 100000:
+        score += 2
+    elif platelet < 150000:
+        score += 1
+    return score
+
+
+def get_verdict(score):
+    if score <= 1:
+        return "Mild"
+    elif score == 2:
+        return "Moderate"
+    elif score == 3:
+        return "Severe"
+    else:
+        return "Very Severe"
+
+
+def score_verdict(age, platelet, igg, igm, ns1):
+    return get_verdict(calculate_severity(age, platelet, igg, igm, ns1))
+
+
+# === Serology Rules (streamlitee.py) ===
+def serology_verdict(age, platelet, igg, igm, ns1):
+    if lab_flag(ns1) or lab_flag(igg) or lab_flag(igm):
+        if platelet < 100000:
+            if platelet < 50000:
+                return "Very Severe"
+            return "Severe"
+        return "Moderate"
+    return "Normal"
+
+
+# === NS1 Rules (simulator.py) ===
+def ns1_verdict(age, platelet, igg, igm, ns1):
+    if lab_flag(ns1) and (lab_flag(igg) or lab_flag(igm)) and platelet < 50000:
+        return "Very Severe"
+    elif lab_flag(ns1) and platelet < 100000:
+        return "Severe"
+    else:
+        return "Normal"
+
+
+RULE_SETS = {
+    "score": RuleSet(score_verdict, ("Severe", "Very Severe")),
+    "serology": RuleSet(serology_verdict, ("Severe", "Very Severe")),
+    "ns1": RuleSet(ns1_verdict, ("Very Severe",)),
+}
+
+
+def get_rule_set(rules):
+    if isinstance(rules, RuleSet):
+        return rules
+    try:
+        return RULE_SETS[rules]
+    except KeyError:
+        raise ValueError(f"Unknown rule set {rules!r}, expected one of {sorted(RULE_SETS)}") from None
@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory, util
+
+import numpy as np
+
+from allocation_engine.audit import AuditLog
+from allocation_engine.metrics import metrics
+
+# === Multi-Process Allocation Service ===
+# Worker processes open the engine snapshot with mmap_mode='r', so the forecast planes
+# and reroute tables live once in the page cache however many workers there are. The
+# only mutable state, beds handed out so far, is a BedLedger in shared memory.
+
+
+class BedLedger:
+    # Reserved-bed counts per (resource, period, hospital) in a SharedMemory block.
+    # reserve()/release() run under a per-hospital lock stripe, so two processes never
+    # hand out the same last bed while requests for different hospitals do not contend.
+    def __init__(self, shape, name=None, locks=None):
+        self.shape = tuple(shape)
+        nbytes = max(1, int(np.prod(self.shape)) * np.dtype(np.int32).itemsize)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes if self.owner else 0)
+        self.reserved = np.ndarray(self.shape, dtype=np.int32, buffer=self.shm.buf)
+        if self.owner:
+            self.reserved[...] = 0
+        if locks is None:
+            locks = [multiprocessing.Lock() for _ in range(min(self.shape[-1], 64) or 1)]
+        self.locks = locks
+
+    def __getstate__(self):
+        # Sent to worker processes at start-up; they attach to the same block and locks
+        return {"shape": self.shape, "name": self.shm.name, "locks": self.locks}
+
+    def __setstate__(self, state):
+        self.__init__(state["shape"], state["name"], state["locks"])
+
+    def _lock(self, hospital):
+        return self.locks[hospital % len(self.locks)]
+
+    def reserve(self, resource, period, hospital, limit):
+        # Takes one bed if fewer than `limit` are reserved; returns whether it did
+        with self._lock(hospital):
+            if self.reserved[resource, period, hospital] >= limit:
+                return False
+            self.reserved[resource, period, hospital] += 1
+            return True
+
+    def release(self, resource, period, hospital):
+        with self._lock(hospital):
+            if self.reserved[resource, period, hospital] <= 0:
+                raise ValueError("No reserved bed to release")
+            self.reserved[resource, period, hospital] -= 1
+
+    def close(self):
+        # Drop the NumPy view before the buffer it points into
+        self.reserved = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_worker_engine = None
+
+
+def _init_worker(snapshot_path, rules, ledger, audit_path):
+    global _worker_engine
+    from allocation_engine.engine import AllocationEngine
+
+    # A forked worker starts with a copy of the parent's metrics; only its own are sent back
+    metrics.drain()
+    _worker_engine = AllocationEngine.from_snapshot(snapshot_path, rules=rules)
+    _worker_engine.ledger = ledger
+    if audit_path:
+        # One log per worker: the record writer is not shared between processes
+        _worker_engine.audit_log = AuditLog(f"{audit_path}.{os.getpid()}", _worker_engine.hospital_names)
+        # Pool workers skip atexit; flush the log when the worker shuts down instead
+        util.Finalize(_worker_engine, _worker_engine.close, exitpriority=10)
+
+
+def _worker_allocate(args):
+    # One batch of patients; the worker's metrics ride back with the results
+    patients, options = args
+    results = [_worker_engine.allocate(*patient, **options) for patient in patients]
+    return results, metrics.drain() if metrics.enabled else None
+
+
+class AllocationService:
+    # Pool of allocation workers over one snapshot and one shared bed ledger.
+    #   with AllocationService("rf_predictions_2026_2027_dynamic.xlsx", processes=4) as service:
+    #       results = service.allocate_many(patients)
+    def __init__(self, pred_path="rf_predictions_2026_2027_dynamic.xlsx", snapshot_path="allocation_snapshot",
+                 distance_path="distance matrix.csv", coords_path="hospital coordinates.csv", rules="score",
+                 processes=None, audit_path=None):
+        from allocation_engine.engine import AllocationEngine
+
+        # Brings the snapshot up to date with the prediction files, then maps it
+        AllocationEngine.load(pred_path, distance_path, coords_path, rules=rules, snapshot_path=snapshot_path)
+        self.engine = AllocationEngine.from_snapshot(snapshot_path, rules=rules)
+        self.ledger = BedLedger((len(self.engine.occupied),) + self.engine.present.shape)
+        self.engine.ledger = self.ledger
+        self.pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                         initargs=(snapshot_path, rules, self.ledger, audit_path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _collect(self, batch):
+        results, worker_metrics = batch
+        if worker_metrics is not None:
+            metrics.merge(worker_metrics)
+        return results
+
+    def allocate(self, hospital, date_input, age, weight, platelet, igg, igm, ns1, **options):
+        patient = (hospital, date_input, age, weight, platelet, igg, igm, ns1)
+        return self._collect(self.pool.apply(_worker_allocate, (([patient], options),)))[0]
+
+    def allocate_many(self, patients, chunksize=64, **options):
+        # Results come back in input order
+        patients = [tuple(p) for p in patients]
+        batches = [(patients[i:i + chunksize], options) for i in range(0, len(patients), chunksize)]
+        return [result for batch in self.pool.map(_worker_allocate, batches, 1) for result in self._collect(batch)]
+
+    def release(self, hospital, date_input, resource_type):
+        self.engine.release(hospital, date_input, resource_type)
+
+    def reserved(self, resource_type):
+        # Copy of the (period, hospital) reserved-bed counts for one resource
+        return self.ledger.reserved[self.engine.resource_positions[resource_type]].copy()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            self.ledger.close()
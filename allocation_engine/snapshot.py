@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from allocation_engine.data import HospitalTable
+from allocation_engine.spatial import HospitalIndex, normalize_name
+
+# === Engine Snapshot ===
+# A directory of uncompressed .npy files (capacity planes, reroute table, names) plus a
+# meta.json. Loading needs NumPy only, so a CLI run from a snapshot never imports
+# pandas, and the planes are memory-mapped: a daily engine (730 periods) touches only
+# the pages of the days it is asked about.
+SNAPSHOT_VERSION = 4
+
+
+def source_signature(*paths):
+    # (size, mtime) of every input, Parquet siblings included; missing files count too
+    signature = []
+    for path in paths:
+        if not path:
+            continue
+        stem, _ = os.path.splitext(path)
+        for candidate in dict.fromkeys([path, f"{stem}.parquet"]):
+            try:
+                st = os.stat(candidate)
+                signature.append(f"{candidate}:{st.st_size}:{st.st_mtime_ns}")
+            except OSError:
+                signature.append(f"{candidate}:missing")
+    return "|".join(signature)
+
+
+def _periodic(plane):
+    # Capacities do not change between forecast periods: store one row when that holds
+    if len(plane) > 1 and np.array_equal(plane, np.broadcast_to(plane[:1], plane.shape), equal_nan=True):
+        return plane[:1]
+    return plane
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(engine, path, sources=""):
+    index = engine.hospital_index
+    arrays = {
+        "hospital_names": np.array(engine.hospital_names, dtype=str),
+        "index_names": np.array(index.names, dtype=str),
+        "periods": np.array(engine.periods, dtype=np.int16).reshape(len(engine.periods), -1),
+        "present": engine.present,
+    }
+    for i, resource_type in enumerate(engine.occupied):
+        arrays[f"occupied_{i}"] = engine.occupied[resource_type]
+        arrays[f"capacity_{i}"] = _periodic(engine.capacity[resource_type])
+        if resource_type in engine.occupied_quantiles:
+            arrays[f"occupied_quantiles_{i}"] = engine.occupied_quantiles[resource_type]
+    if index.distances is not None:
+        arrays["distances"] = index.distances
+        arrays["reroute_order"] = index.reroute_order
+    if index.coords is not None:
+        arrays["coords"] = index.coords
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "sources": sources,
+        "resources": list(engine.occupied),
+        "quantile_levels": list(engine.quantile_levels),
+        "arrays": sorted(arrays),
+    }
+
+    # Written next to the target and swapped in, so readers never see a partial snapshot
+    tmp = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    old = f"{path}.old{os.getpid()}"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_arrays(path, sources=None, mmap_mode="r"):
+    # (meta, {name: array}) or None when the snapshot is missing, from another version,
+    # or (if sources is given) built from different input files.
+    meta = _read_meta(path)
+    if meta is None or meta.get("version") != SNAPSHOT_VERSION:
+        return None
+    if sources is not None and meta["sources"] != sources:
+        return None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+              for name in meta["arrays"]}
+    return meta, arrays
+
+
+def engine_from_arrays(meta, arrays, engine_cls, rules="score"):
+    index = HospitalIndex(
+        arrays["index_names"].tolist(),
+        coords=arrays.get("coords"),
+        distances=arrays.get("distances"),
+        reroute_order=arrays.get("reroute_order"),
+    )
+    names = arrays["hospital_names"].tolist()
+    hospitals = HospitalTable([normalize_name(n) for n in names], names)
+    shape = arrays["present"].shape
+    occupied, capacity, quantiles = {}, {}, {}
+    for i, resource_type in enumerate(meta["resources"]):
+        occupied[resource_type] = arrays[f"occupied_{i}"]
+        capacity[resource_type] = np.broadcast_to(arrays[f"capacity_{i}"], shape)
+        if f"occupied_quantiles_{i}" in arrays:
+            quantiles[resource_type] = arrays[f"occupied_quantiles_{i}"]
+    periods = [tuple(int(v) for v in p) for p in arrays["periods"]]
+    return engine_cls(hospitals, periods, arrays["present"], occupied, capacity, index, rules=rules,
+                      quantile_levels=meta["quantile_levels"], occupied_quantiles=quantiles)
+
+
+def load_snapshot(path, engine_cls, rules="score", sources=None):
+    loaded = load_arrays(path, sources)
+    if loaded is None:
+        return None
+    return engine_from_arrays(*loaded, engine_cls, rules=rules)
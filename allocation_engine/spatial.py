@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def normalize_name(name):
+    return str(name).strip().lower()
+
+
+def _to_xyz(lat_lon):
+    # Points on a sphere: straight-line (chord) order is the same as great-circle order,
+    # so a plain KD-tree over xyz answers "nearest hospital" queries exactly.
+    lat = np.radians(np.asarray(lat_lon, dtype=float)[..., 0])
+    lon = np.radians(np.asarray(lat_lon, dtype=float)[..., 1])
+    return EARTH_RADIUS_KM * np.stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / (2 * EARTH_RADIUS_KM), 0, 1))
+
+
+# === Hospital Spatial Index ===
+# Built once at load time:
+#   * distance matrix -> per-origin reroute order precomputed with one argsort. Pairs
+#     without a road distance (sites only in the coordinates file) fall back to the
+#     great-circle distance, so a hospital is always rerouted in road order.
+#   * coordinates     -> KD-tree for (lat, lon) patient locations, and for every query
+#     when there is no distance matrix; scales to thousands of clinics.
+class HospitalIndex:
+    def __init__(self, names, coords=None, distances=None, reroute_order=None):
+        self.names = list(names)
+        self.keys = [normalize_name(n) for n in self.names]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.distances = None
+        self.reroute_order = None
+        self.coords = None
+        self._tree = None
+
+        if coords is not None:
+            self.coords = np.asarray(coords, dtype=float)
+
+        if distances is not None:
+            self.distances = np.asarray(distances, dtype=np.float32)
+            if self.coords is not None and np.isnan(self.distances).any():
+                xyz = _to_xyz(self.coords)
+                chord = np.linalg.norm(xyz[:, None, :] - xyz[None, :, :], axis=-1)
+                self.distances = np.where(np.isnan(self.distances), _chord_to_km(chord), self.distances)
+                self.distances = self.distances.astype(np.float32)
+            if reroute_order is None:
+                reroute_order = np.argsort(self.distances, axis=1)
+            self.reroute_order = np.asarray(reroute_order).astype(np.int32 if len(self.names) > 32767 else np.int16)
+
+        if self.coords is None and self.reroute_order is None:
+            raise ValueError("HospitalIndex needs coordinates or a distance matrix")
+
+    @property
+    def tree(self):
+        # scipy is only imported, and the KD-tree only built, on the first spatial query
+        if self._tree is None and self.coords is not None:
+            from scipy.spatial import cKDTree
+
+            self._tree = cKDTree(_to_xyz(self.coords))
+        return self._tree
+
+    @classmethod
+    def from_files(cls, distance_path="distance matrix.csv", coords_path="hospital coordinates.csv"):
+        import pandas as pd
+
+        distance_df = pd.read_csv(distance_path, index_col=0)
+        distance_df.index = distance_df.index.str.strip()
+        distance_df.columns = distance_df.columns.str.strip()
+        distance_df = distance_df.apply(pd.to_numeric, errors='coerce')
+
+        names = list(distance_df.index)
+        distances = distance_df.reindex(columns=names).to_numpy()
+        coords = None
+
+        # Optional: Hospital, Latitude, Longitude. Sites missing from the matrix (clinics,
+        # field hospitals) are appended and served by the KD-tree alone.
+        if coords_path and os.path.exists(coords_path):
+            coord_df = pd.read_csv(coords_path)
+            coord_df["Hospital"] = coord_df["Hospital"].str.strip()
+            known = {normalize_name(n) for n in names}
+            extra = [h for h in coord_df["Hospital"] if normalize_name(h) not in known]
+            if extra:
+                pad = np.full((len(names) + len(extra),) * 2, np.nan)
+                pad[:len(names), :len(names)] = distances
+                np.fill_diagonal(pad, 0.0)
+                distances = pad
+                names = names + extra
+            coord_df["_norm"] = coord_df["Hospital"].map(normalize_name)
+            coord_df = coord_df.set_index("_norm").reindex([normalize_name(n) for n in names])
+            if coord_df[["Latitude", "Longitude"]].isna().any().any():
+                raise ValueError(f"{coords_path} is missing coordinates for some hospitals")
+            coords = coord_df[["Latitude", "Longitude"]].to_numpy()
+
+        return cls(names, coords=coords, distances=distances)
+
+    def __len__(self):
+        return len(self.names)
+
+    def position(self, name):
+        return self.positions.get(normalize_name(name))
+
+    def align(self, values, fill=False):
+        # Reorder a Series keyed by hospital name into index order
+        values = values.copy()
+        values.index = values.index.map(normalize_name)
+        return values.reindex(self.keys, fill_value=fill).to_numpy()
+
+    def distance(self, i, j):
+        if self.distances is not None:
+            d = self.distances[i, j]
+            if not np.isnan(d):
+                return float(d)
+        if self.coords is not None:
+            return float(_chord_to_km(np.linalg.norm(_to_xyz(self.coords[i]) - _to_xyz(self.coords[j]))))
+        return float("nan")
+
+    def nearest(self, origin, k):
+        # origin: hospital name / position, or a (lat, lon) patient location
+        k = min(k, len(self.names))
+        if isinstance(origin, str):
+            pos = self.position(origin)
+            if pos is None:
+                raise KeyError(origin)
+            origin = pos
+
+        # A hospital origin walks its road-distance row; the tree answers everything else
+        if isinstance(origin, (int, np.integer)) and self.reroute_order is not None:
+            idx = self.reroute_order[origin, :k]
+            return idx, self.distances[origin, idx]
+        if self.coords is None:
+            raise ValueError("Location queries need hospital coordinates")
+
+        point = self.tree.data[origin] if isinstance(origin, (int, np.integer)) else _to_xyz(origin)
+        chord, idx = self.tree.query(point, k=k)
+        return np.atleast_1d(idx), _chord_to_km(np.atleast_1d(chord))
+
+    def nearest_available(self, origin, free, k=1):
+        # k nearest sites whose entry in the boolean `free` mask is set, excluding the origin.
+        # Returns (positions, distances, hops); hops counts the candidates examined per hit.
+        free = np.asarray(free, dtype=bool)
+        n = len(self.names)
+        if isinstance(origin, str):
+            pos = self.position(origin)
+            if pos is None:
+                raise KeyError(origin)
+            origin = pos
+        # The precomputed reroute row already covers every site; the tree is widened on demand.
+        by_row = isinstance(origin, (int, np.integer)) and self.reroute_order is not None
+        m = n if by_row else min(n, max(8, 4 * k))
+        while True:
+            idx, dist = self.nearest(origin, m)
+            candidate = np.ones(len(idx), dtype=bool)
+            if isinstance(origin, (int, np.integer)):
+                candidate = idx != origin
+            keep = free[idx] & candidate
+            if keep.sum() >= k or m >= n:
+                hit = np.flatnonzero(keep)[:k]
+                return idx[hit], dist[hit], np.cumsum(candidate)[hit]
+            m = min(n, m * 4)
@@ -0,0 +1,301 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# === End-to-End Regression Benchmark ===
+# forecast -> allocation indexes -> replay of every census row as a synthetic patient.
+# Writes a JSON report (stage timings, peak RSS, decision checksums) and compares it
+# with the stored baseline: a changed checksum or a slower/bigger stage exits 1.
+#   python benchmark.py                    # rf backend against benchmark_baseline.json
+#   python benchmark.py --model svm --daily
+#   python benchmark.py --update-baseline  # accept the current numbers
+CENSUS = "dataset new cleaned excel.xlsx"
+DISTANCES = "distance matrix.csv"
+COORDINATES = "hospital coordinates.csv"
+BASELINE = "benchmark_baseline.json"
+REPORT = "benchmark_report.json"
+SCRIPTS = {
+    "rf": "random_forest_predict_dynamic.py",
+    "xgb": "xgboost_predict_dynamic.py",
+    "mlp": "mlp_predict_dynamic.py",
+    "svm": "svm_predict_dynamic.py",
+}
+SEED = 2026
+# Differences below this many seconds are timer noise, whatever the ratio
+MIN_SLOWDOWN = 0.05
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_mb(children=False):
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def stage_seconds(metrics_text, prefix):
+    # Sums of dengue_*_stage_seconds histograms from a Prometheus text dump, by stage
+    stages = {}
+    for labels, value in re.findall(r'^dengue_\w+_stage_seconds_sum\{([^}]*)\} (\S+)$', metrics_text, re.M):
+        stage = re.search(r'stage="([^"]*)"', labels).group(1)
+        stages[f"{prefix}.{stage}"] = round(stages.get(f"{prefix}.{stage}", 0.0) + float(value), 4)
+    return stages
+
+
+def frame_checksum(df):
+    import pandas as pd
+
+    digest = hashlib.sha256("|".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# === Stage 1: Forecast ===
+def train(model, daily, workdir):
+    # Runs the backend script in a scratch directory so the tracked prediction files
+    # are left alone; its own stage timers are collected through DENGUE_METRICS_FILE.
+    try:
+        os.symlink(os.path.join(ROOT, CENSUS), os.path.join(workdir, CENSUS))
+    except OSError:
+        shutil.copy(os.path.join(ROOT, CENSUS), workdir)
+    metrics_path = os.path.join(workdir, "forecast.prom")
+    command = [sys.executable, os.path.join(ROOT, SCRIPTS[model]), "--no-excel"] + (["--daily"] if daily else [])
+    env = dict(os.environ, DENGUE_METRICS_FILE=metrics_path)
+    env.pop("DENGUE_METRICS_PORT", None)
+
+    start = time.perf_counter()
+    subprocess.run(command, cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+    timings = {"train": round(time.perf_counter() - start, 4)}
+    with open(metrics_path) as f:
+        timings.update(stage_seconds(f.read(), "train"))
+
+    stem = f"{model}_daily_predictions_2026_2027_dynamic" if daily else f"{model}_predictions_2026_2027_dynamic"
+    return os.path.join(workdir, f"{stem}.parquet"), timings
+
+
+# === Stage 2: Allocation Indexes ===
+def build_engine(pred_path, workdir):
+    from allocation_engine import AllocationEngine, HospitalIndex, read_predictions
+
+    timings = {}
+    start = time.perf_counter()
+    pred_df = read_predictions(pred_path)
+    hospital_index = HospitalIndex.from_files(os.path.join(ROOT, DISTANCES), os.path.join(ROOT, COORDINATES))
+    timings["index.load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = AllocationEngine.from_predictions(pred_df, hospital_index)
+    timings["index.build"] = time.perf_counter() - start
+
+    snapshot_path = os.path.join(workdir, "snapshot")
+    start = time.perf_counter()
+    engine.save_snapshot(snapshot_path)
+    timings["index.snapshot_save"] = time.perf_counter() - start
+    start = time.perf_counter()
+    engine = AllocationEngine.from_snapshot(snapshot_path)
+    timings["index.snapshot_load"] = time.perf_counter() - start
+
+    return engine, frame_checksum(pred_df), {k: round(v, 4) for k, v in timings.items()}
+
+
+# === Stage 3: Replay ===
+def synthetic_patients(census):
+    # One patient per census row: that row's hospital and calendar day, moved into the
+    # forecast years, with seeded lab values inside the row's recorded age range.
+    from forecasting.features import FUTURE_YEARS, HOSPITAL_COLUMN
+
+    rng = np.random.default_rng(SEED)
+    n = len(census)
+    dates = census["Date"]
+    years = np.asarray(FUTURE_YEARS)[dates.dt.year.to_numpy() % len(FUTURE_YEARS)]
+    months = dates.dt.month.to_numpy()
+    days = np.where((months == 2) & (dates.dt.day.to_numpy() == 29), 28, dates.dt.day.to_numpy())
+    age_min = census["Age (Min)"].fillna(1).to_numpy(dtype=int)
+    age_max = np.maximum(census["Age (Max)"].fillna(90).to_numpy(dtype=int), age_min)
+    ages = rng.integers(age_min, age_max + 1)
+    weights = np.round(rng.uniform(8, 95, n), 1)
+    platelets = rng.integers(5_000, 300_000, n)
+    labs = rng.integers(0, 2, (n, 3))
+    hospitals = census[HOSPITAL_COLUMN].astype(str).to_numpy()
+    return [
+        (hospitals[i], f"{years[i]:04d}-{months[i]:02d}-{days[i]:02d}", int(ages[i]), float(weights[i]),
+         int(platelets[i]), int(labs[i, 0]), int(labs[i, 1]), int(labs[i, 2]))
+        for i in range(n)
+    ]
+
+
+def replay_variants(engine):
+    # (rules, allocate() options, keep beds): rule sets of the three front ends, the
+    # forced reroute of allocation2.py, a run where every patient keeps their bed in a
+    # BedLedger so hospitals fill up, and a confidence-aware run when there are quantiles
+    variants = {rules: (rules, {}, False) for rules in ("score", "serology", "ns1")}
+    variants["score_forced_reroute"] = ("score", {"force_reroute": True}, False)
+    variants["score_ledger"] = ("score", {}, True)
+    if engine.quantile_levels:
+        variants[f"score_q{round(max(engine.quantile_levels) * 100)}"] = (
+            "score", {"confidence": max(engine.quantile_levels)}, False)
+    return variants
+
+
+def replay(engine, patients, repeat=3):
+    # Each variant runs `repeat` times from a fresh ledger; the fastest run is reported
+    # and every run must produce the same decisions.
+    from allocation_engine.rules import get_rule_set
+    from allocation_engine.service import BedLedger
+
+    timings, checksums, outcomes = {}, {}, {}
+    for name, (rules, options, keep_beds) in replay_variants(engine).items():
+        engine.rules = get_rule_set(rules)
+        runs = []
+        for _ in range(repeat):
+            if keep_beds:
+                engine.ledger = BedLedger((len(engine.occupied),) + engine.present.shape)
+            digest = hashlib.sha256()
+            notes = {}
+            start = time.perf_counter()
+            for patient in patients:
+                result = engine.allocate(*patient, **options)
+                digest.update(json.dumps(result, sort_keys=True, default=str).encode())
+                digest.update(b"\n")
+                note = result.get("Note", result.get("Error"))
+                notes[note] = notes.get(note, 0) + 1
+            runs.append(time.perf_counter() - start)
+            if engine.ledger is not None:
+                engine.ledger.close()
+                engine.ledger = None
+            if checksums.setdefault(f"decisions.{name}", digest.hexdigest()) != digest.hexdigest():
+                raise RuntimeError(f"Replay '{name}' is not deterministic")
+        timings[f"replay.{name}"] = round(min(runs), 4)
+        outcomes[name] = dict(sorted(notes.items()))
+    return timings, checksums, outcomes
+
+
+def run(args):
+    import pandas as pd
+
+    report = {
+        "key": args.key,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "timings": {},
+        "peak_rss_mb": {},
+        "checksums": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="dengue-bench-") as workdir:
+        if args.predictions:
+            pred_path = args.predictions
+        else:
+            pred_path, timings = train(args.model, args.daily, workdir)
+            report["timings"].update(timings)
+            report["peak_rss_mb"]["train"] = peak_rss_mb(children=True)
+
+        engine, report["checksums"]["predictions"], timings = build_engine(pred_path, workdir)
+        report["timings"].update(timings)
+
+        start = time.perf_counter()
+        census = pd.read_excel(os.path.join(ROOT, CENSUS))
+        patients = synthetic_patients(census)
+        report["timings"]["replay.census_load"] = round(time.perf_counter() - start, 4)
+        report["patients"] = len(patients)
+
+        timings, checksums, report["outcomes"] = replay(engine, patients, args.repeat)
+        report["timings"].update(timings)
+        report["checksums"].update(checksums)
+        # The snapshot is memory-mapped from workdir; unmap it before the directory goes
+        engine.close()
+        del engine
+    report["peak_rss_mb"]["benchmark"] = peak_rss_mb()
+    return report
+
+
+# === Baseline Comparison ===
+def compare(report, baseline, tolerance):
+    # Returns the list of failures; checksums must match exactly, timings and RSS may
+    # grow by `tolerance` times
+    failures = []
+    for name, expected in baseline.get("checksums", {}).items():
+        actual = report["checksums"].get(name)
+        if actual != expected:
+            failures.append(f"behaviour change: {name} checksum {actual} != baseline {expected}")
+    for name, expected in baseline.get("timings", {}).items():
+        actual = report["timings"].get(name)
+        if actual is not None and actual > expected * tolerance and actual - expected > MIN_SLOWDOWN:
+            failures.append(f"performance regression: {name} took {actual:.3f}s (baseline {expected:.3f}s)")
+    for name, expected in baseline.get("peak_rss_mb", {}).items():
+        actual = report["peak_rss_mb"].get(name)
+        if actual is not None and expected is not None and actual > expected * tolerance:
+            failures.append(f"memory regression: {name} peak RSS {actual} MB (baseline {expected} MB)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast -> allocate -> replay regression benchmark")
+    parser.add_argument("--model", choices=sorted(SCRIPTS), default="rf", help="forecasting backend to train")
+    parser.add_argument("--daily", action="store_true", help="train and allocate per calendar day")
+    parser.add_argument("--predictions", help="skip training and benchmark this prediction file")
+    parser.add_argument("--baseline", default=os.path.join(ROOT, BASELINE))
+    parser.add_argument("--report", default=REPORT)
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown/memory growth factor before failing (default 1.5)")
+    parser.add_argument("--repeat", type=int, default=3, help="replay runs per variant, fastest is kept (default 3)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+    if args.predictions:
+        args.key = f"file:{os.path.basename(args.predictions)}"
+    else:
+        args.key = f"{args.model}-daily" if args.daily else args.model
+
+    report = run(args)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark report written to {args.report}")
+    for name, seconds in report["timings"].items():
+        print(f"  {name:<32} {seconds:9.3f}s")
+    print(f"  peak RSS (MB): {report['peak_rss_mb']}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        baselines[args.key] = {k: report[k] for k in ("environment", "timings", "peak_rss_mb", "checksums")}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Baseline '{args.key}' updated in {args.baseline}")
+        return 0
+
+    if args.key not in baselines:
+        print(f"❌ No baseline '{args.key}' in {args.baseline}; run with --update-baseline to create it")
+        return 1
+    failures = compare(report, baselines[args.key], args.tolerance)
+    if failures:
+        print(f"❌ Benchmark '{args.key}' FAILED against {args.baseline}:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"✅ Benchmark '{args.key}' matches the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
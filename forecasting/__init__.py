@@ -0,0 +1,6 @@
+from forecasting.features import (COUNT_TARGETS, DAILY_FEATURES, DYNAMIC_FEATURES, FIXED_COLUMNS, TARGETS,
+                                  TrainingMatrix, build_training_matrix, load_census, store_prediction)
+from forecasting.ingest import MonthlyAggregator, iter_census_chunks, prepare_census, stream_monthly_census
+from forecasting.output import save_predictions
+from forecasting.quantiles import (QUANTILE_TARGETS, QUANTILES, conformal_quantiles, forest_quantiles, quantile_column,
+                                   store_quantiles)
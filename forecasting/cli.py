@@ -0,0 +1,16 @@
+import argparse
+
+
+# Command-line flags shared by the *_predict_dynamic.py scripts
+def parse_forecast_args(model, argv=None):
+    parser = argparse.ArgumentParser(description=f"{model} forecast of hospital occupancy for 2026-2027")
+    parser.add_argument("--stream", action="store_true",
+                        help="chunked read with incremental monthly aggregation, for census exports too big for RAM")
+    parser.add_argument("--no-excel", dest="excel", action="store_false",
+                        help="only write the Parquet artifact the allocators read")
+    parser.add_argument("--daily", action="store_true",
+                        help="one prediction per hospital per calendar day instead of per month")
+    args = parser.parse_args(argv)
+    if args.stream and args.daily:
+        parser.error("--stream aggregates to months and cannot be combined with --daily")
+    return args
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Target variables and fixed features
+TARGETS = ['Total Admitted till date', 'Admitted Patient in present', 'Beds Occupied',
+           'ICU Beds Occupied', 'Bed occupancy rate', 'ICU occupancy rate']
+COUNT_TARGETS = ['Total Admitted till date', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']
+FIXED_COLUMNS = ['Beds Total', 'ICU Beds Total']
+DYNAMIC_FEATURES = ['Year', 'Month', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']
+DAILY_FEATURES = ['Year', 'Month', 'Day', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']
+MONTHLY_INPUTS = ['Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']
+HOSPITAL_COLUMN = 'Hospital (DSCC Region)'
+
+FUTURE_YEARS = (2026, 2027)
+YEARLY_GROWTH = 1.10
+
+
+def load_census(path='dataset new cleaned excel.xlsx', streaming=False, daily=False):
+    # streaming=True reads the workbook/CSV in bounded chunks and returns one row per
+    # hospital-month (monthly means) instead of every daily row.
+    from forecasting.ingest import prepare_census, stream_monthly_census
+
+    if streaming and daily:
+        raise ValueError("Streaming ingestion aggregates to months and cannot feed a daily forecast")
+    if streaming:
+        columns = list(dict.fromkeys(MONTHLY_INPUTS + TARGETS + FIXED_COLUMNS))
+        return stream_monthly_census(path, columns)
+    return prepare_census(pd.read_excel(path))
+
+
+# === Training Matrix ===
+# Built in one vectorized pass over the whole census: rows are grouped by hospital so
+# slice(h) returns zero-copy views, and `valid` marks the usable rows per target.
+class TrainingMatrix:
+    def __init__(self, hospitals, offsets, X, Y, valid, future, fixed, features=DYNAMIC_FEATURES):
+        self.features = features        # DYNAMIC_FEATURES, or DAILY_FEATURES for daily forecasts
+        self.hospitals = hospitals      # names, in order of first appearance
+        self.offsets = offsets          # rows of hospital h: offsets[h]:offsets[h + 1]
+        self.X = X                      # (rows, features) float64
+        self.Y = Y                      # (rows, TARGETS) float64
+        self.valid = valid              # (rows, TARGETS) features and target all present
+        self.future = future            # (hospitals, 24 months or 730 days, features) forecast inputs
+        self.fixed = fixed              # (hospitals, FIXED_COLUMNS) first recorded capacity
+
+    def __len__(self):
+        return len(self.hospitals)
+
+    def slice(self, h):
+        a, b = self.offsets[h], self.offsets[h + 1]
+        return self.X[a:b], self.Y[a:b], self.valid[a:b]
+
+    def training_set(self, h, t):
+        X, Y, valid = self.slice(h)
+        mask = valid[:, t]
+        return X[mask], Y[mask, t]
+
+    def future_frame(self, h):
+        # Same layout as the per-hospital frames the scripts used to build by hand
+        frame = pd.DataFrame(self.future[h], columns=self.features)
+        for col in ('Year', 'Month', 'Day'):
+            if col in frame:
+                frame[col] = frame[col].astype(int)
+        for i, col in enumerate(FIXED_COLUMNS):
+            frame[col] = self.fixed[h, i]
+        return frame
+
+
+def _future_days(base_monthly, base_daily):
+    # Every calendar day of FUTURE_YEARS; (month, day) averages where the history has
+    # them, the month average otherwise (e.g. 29 February).
+    days = pd.date_range(f"{FUTURE_YEARS[0]}-01-01", f"{FUTURE_YEARS[-1]}-12-31", freq="D")
+    month, day = days.month.to_numpy(), days.day.to_numpy()
+    inputs = base_daily[:, month - 1, day - 1]
+    inputs = np.where(np.isnan(inputs), base_monthly[:, month - 1], inputs)
+    growth = YEARLY_GROWTH ** (days.year.to_numpy() - FUTURE_YEARS[0])
+    future = np.empty((base_monthly.shape[0], len(days), len(DAILY_FEATURES)))
+    future[..., 0] = days.year.to_numpy()
+    future[..., 1] = month
+    future[..., 2] = day
+    future[..., 3:] = inputs * growth[None, :, None]
+    return future
+
+
+def build_training_matrix(data, daily=False):
+    features = DAILY_FEATURES if daily else DYNAMIC_FEATURES
+    codes, hospitals = pd.factorize(data[HOSPITAL_COLUMN])
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    offsets = np.searchsorted(codes, np.arange(len(hospitals) + 1))
+
+    # Single numeric coercion for every feature and target column
+    numeric = data[list(dict.fromkeys(features + TARGETS + FIXED_COLUMNS))].apply(pd.to_numeric, errors='coerce')
+    numeric = numeric.iloc[order]
+    X = numeric[features].to_numpy(dtype=float)
+    Y = numeric[TARGETS].to_numpy(dtype=float)
+    valid = ~np.isnan(Y) & ~np.isnan(X).any(axis=1)[:, None]
+
+    # Month-wise averages of the dynamic inputs for every hospital at once
+    monthly = numeric[MONTHLY_INPUTS].groupby([codes, numeric['Month'].to_numpy()]).mean()
+    monthly = monthly.reindex(pd.MultiIndex.from_product([range(len(hospitals)), range(1, 13)]))
+    base = monthly.to_numpy(dtype=float).reshape(len(hospitals), 12, len(MONTHLY_INPUTS))
+
+    if daily:
+        by_day = numeric[MONTHLY_INPUTS].groupby(
+            [codes, numeric['Month'].to_numpy(), numeric['Day'].to_numpy()]).mean()
+        by_day = by_day.reindex(pd.MultiIndex.from_product([range(len(hospitals)), range(1, 13), range(1, 32)]))
+        base_daily = by_day.to_numpy(dtype=float).reshape(len(hospitals), 12, 31, len(MONTHLY_INPUTS))
+        future = _future_days(base, base_daily)
+    else:
+        future = np.empty((len(hospitals), 12 * len(FUTURE_YEARS), len(DYNAMIC_FEATURES)))
+        for i, year in enumerate(FUTURE_YEARS):
+            block = future[:, 12 * i:12 * (i + 1)]
+            block[..., 0] = year
+            block[..., 1] = np.arange(1, 13)
+            # Each year after the first grows by 10%
+            block[..., 2:] = base * YEARLY_GROWTH ** i
+
+    fixed = data[FIXED_COLUMNS].iloc[order].groupby(codes).first().reindex(range(len(hospitals))).to_numpy()
+    return TrainingMatrix(list(hospitals), offsets, X, Y, valid, future, fixed, features)
+
+
+def store_prediction(predictions, target, pred):
+    if target in COUNT_TARGETS:
+        predictions[target] = np.clip(np.round(pred), 0, None).astype(int)
+    else:
+        predictions[target] = np.round(pred, 4)
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from forecasting.features import HOSPITAL_COLUMN
+
+CHUNK_ROWS = 50000
+
+
+def prepare_census(data):
+    data['Date'] = pd.to_datetime(data['Date'])
+    data['Year'] = data['Date'].dt.year
+    data['Month'] = data['Date'].dt.month
+    data['Day'] = data['Date'].dt.day
+
+    # Recalculate occupancy rates
+    data['Bed occupancy rate'] = data['Beds Occupied'] / data['Beds Total']
+    data['ICU occupancy rate'] = data['ICU Beds Occupied'] / data['ICU Beds Total']
+    return data
+
+
+def iter_census_chunks(path, chunk_rows=CHUNK_ROWS, sheet=0):
+    # Yields raw census rows in bounded frames: CSV through pandas' chunked reader,
+    # workbooks through openpyxl's read-only row iterator.
+    if os.path.splitext(path)[1].lower() == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet] if isinstance(sheet, int) else wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(next(rows))]
+        batch = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+# === Incremental Monthly Aggregation ===
+# Keeps only running sums and counts per (hospital, year, month), so memory grows
+# with the number of facility-months rather than with the number of daily rows.
+class MonthlyAggregator:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.sums = None
+        self.counts = None
+        self.hospital_order = {}
+
+    def add(self, chunk):
+        chunk = prepare_census(chunk)
+        for hosp in chunk[HOSPITAL_COLUMN].unique():
+            self.hospital_order.setdefault(hosp, len(self.hospital_order))
+        values = chunk[self.columns].apply(pd.to_numeric, errors='coerce')
+        grouped = values.groupby([chunk[HOSPITAL_COLUMN], chunk['Year'], chunk['Month']])
+        sums, counts = grouped.sum(), grouped.count()
+        if self.sums is None:
+            self.sums, self.counts = sums, counts
+        else:
+            self.sums = self.sums.add(sums, fill_value=0)
+            self.counts = self.counts.add(counts, fill_value=0)
+
+    def result(self):
+        if self.sums is None:
+            return pd.DataFrame(columns=['Date', HOSPITAL_COLUMN, 'Year', 'Month'] + self.columns)
+        monthly = (self.sums / self.counts.replace(0, np.nan)).reset_index()
+        monthly.columns = [HOSPITAL_COLUMN, 'Year', 'Month'] + self.columns
+        # Hospitals in order of first appearance, months in calendar order
+        monthly['_order'] = monthly[HOSPITAL_COLUMN].map(self.hospital_order)
+        monthly = monthly.sort_values(['_order', 'Year', 'Month'], kind='stable').drop(columns='_order')
+        monthly.insert(0, 'Date', pd.to_datetime(dict(year=monthly['Year'], month=monthly['Month'], day=1)))
+        return monthly.reset_index(drop=True)
+
+
+def stream_monthly_census(path, columns, chunk_rows=CHUNK_ROWS, sheet=0):
+    aggregator = MonthlyAggregator(columns)
+    for chunk in iter_census_chunks(path, chunk_rows, sheet):
+        aggregator.add(chunk)
+    return aggregator.result()
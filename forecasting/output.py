@@ -0,0 +1,68 @@
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import warnings
+
+# Parquet schema metadata key holding the workbook written alongside the file; the
+# allocators (allocation_engine.data) read it to tell whether the workbook changed since.
+WORKBOOK_KEY = b"source_workbook"
+
+
+def _write_excel(df, path):
+    # xlsxwriter in constant-memory mode streams rows to disk; it must be fed row by
+    # row, which DataFrame.to_excel does not do, so rows are written directly.
+    try:
+        import xlsxwriter
+    except ImportError:
+        df.to_excel(path, index=False)
+        return
+
+    columns = [df[c].tolist() for c in df.columns]
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Sheet1")
+    sheet.write_row(0, 0, [str(c) for c in df.columns])
+    for r, row in enumerate(zip(*columns), start=1):
+        sheet.write_row(r, 0, [None if isinstance(v, float) and math.isnan(v) else v for v in row])
+    workbook.close()
+
+
+def workbook_stamp(path):
+    # Size, mtime and content hash: the hash still matches after a fresh clone or copy
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def _write_parquet(df, path, workbook=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if workbook is not None:
+        stamp = json.dumps(workbook_stamp(workbook)).encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), WORKBOOK_KEY: stamp})
+    pq.write_table(table, path)
+
+
+def save_predictions(df, stem, excel=True):
+    # Parquet is the primary artifact the allocators read; the workbook is for people.
+    # The workbook is written first and stamped into the Parquet metadata, so the
+    # Parquet file is used until the workbook is replaced.
+    parquet = importlib.util.find_spec("pyarrow") is not None
+    if not parquet:
+        warnings.warn("pyarrow is not installed, writing the Excel workbook only")
+        # A Parquet file left from an earlier run would shadow the new workbook
+        if os.path.exists(f"{stem}.parquet"):
+            os.remove(f"{stem}.parquet")
+        excel = True
+    paths = []
+    if excel:
+        _write_excel(df, f"{stem}.xlsx")
+        paths.append(f"{stem}.xlsx")
+    if parquet:
+        _write_parquet(df, f"{stem}.parquet", f"{stem}.xlsx" if excel else None)
+        paths.insert(0, f"{stem}.parquet")
+    return paths
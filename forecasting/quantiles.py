@@ -0,0 +1,53 @@
+import warnings
+
+import numpy as np
+
+from forecasting.features import COUNT_TARGETS
+
+# Quantile forecasts are produced for the targets the allocators compare against capacity
+QUANTILES = (0.5, 0.9, 0.95)
+QUANTILE_TARGETS = ['Beds Occupied', 'ICU Beds Occupied']
+MIN_CALIBRATION_ROWS = 10
+
+
+def quantile_column(target, q):
+    return f"{target} q{round(q * 100)}"
+
+
+def forest_quantiles(model, X, quantiles=QUANTILES):
+    # Spread of the individual trees of a fitted random forest: (len(quantiles), rows)
+    per_tree = np.stack([tree.predict(X) for tree in model.estimators_])
+    return np.quantile(per_tree, quantiles, axis=0)
+
+
+def conformal_quantiles(make_model, X, y, future_X, point, quantiles=QUANTILES, calibration=0.2, seed=42):
+    # Split conformal: fit a second model on part of the rows, take the quantiles of its
+    # residuals on the held-out rows and shift the point forecast by them. Returns None
+    # (NaN columns via store_quantiles) when there are too few rows to calibrate on.
+    n_cal = int(len(y) * calibration)
+    if n_cal < MIN_CALIBRATION_ROWS:
+        warnings.warn(f"{len(y)} training rows are too few to calibrate quantile forecasts "
+                      f"(need {int(np.ceil(MIN_CALIBRATION_ROWS / calibration))}); writing NaN quantiles",
+                      stacklevel=2)
+        return None
+    order = np.random.default_rng(seed).permutation(len(y))
+    cal, fit = order[:n_cal], order[n_cal:]
+    model = make_model()
+    model.fit(X[fit], y[fit])
+    residuals = y[cal] - model.predict(X[cal])
+    return point[None, :] + np.quantile(residuals, quantiles)[:, None]
+
+
+def store_quantiles(predictions, target, qpred, quantiles=QUANTILES):
+    # Enforce non-crossing quantiles, then round like the point forecast. qpred=None
+    # writes NaN columns for targets without training rows.
+    if qpred is None:
+        for q in quantiles:
+            predictions[quantile_column(target, q)] = np.nan
+        return
+    qpred = np.maximum.accumulate(np.asarray(qpred, dtype=float), axis=0)
+    for q, pred in zip(quantiles, qpred):
+        if target in COUNT_TARGETS:
+            predictions[quantile_column(target, q)] = np.clip(np.round(pred), 0, None).astype(int)
+        else:
+            predictions[quantile_column(target, q)] = np.round(pred, 4)
@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISTANCES = os.path.join(ROOT, "distance matrix.csv")
+HOSPITALS = ["Dhaka Medical College Hospital", "SSMC & Mitford Hospital", "Bangladesh Shishu Hospital & Institute"]
+MILD = (40, 60, 200000, "Negative", "Negative", "Negative")
+
+
+def write_predictions(path, occupied=(7, 8, 10)):
+    # A tiny forecast: three hospitals, two months, a handful of general beds each
+    rows = []
+    for month in (1, 2):
+        for hospital, occ in zip(HOSPITALS, occupied):
+            rows.append({"Year": 2026, "Month": month, "Hospital": hospital,
+                         "Beds Total": 10, "Beds Occupied": occ, "ICU Beds Total": 2, "ICU Beds Occupied": 1})
+    pd.DataFrame(rows).to_parquet(path)
+    return path
+
+
+@pytest.fixture
+def predictions(tmp_path):
+    return write_predictions(str(tmp_path / "test_predictions_2026_2027_dynamic.parquet"))
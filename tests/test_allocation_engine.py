@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation_engine import AllocationEngine, AllocationService, BedLedger
+from allocation_engine.audit import OK, NO_CAPACITY, read_audit_log
+from conftest import DISTANCES, HOSPITALS, MILD, write_predictions
+
+# Free general beds per hospital in January 2026: total - occupied
+HEADROOM = {"Dhaka Medical College Hospital": 3, "SSMC & Mitford Hospital": 2,
+            "Bangladesh Shishu Hospital & Institute": 0}
+
+
+def _grab_beds(ledger, attempts, limit, granted):
+    for _ in range(attempts):
+        if ledger.reserve(0, 0, 1, limit):
+            with granted.get_lock():
+                granted.value += 1
+
+
+def test_ledger_reserve_is_atomic_across_processes():
+    # Several processes race for the same (resource, period, hospital) cell
+    ledger = BedLedger((1, 1, 3))
+    granted = multiprocessing.Value("i", 0)
+    workers = [multiprocessing.Process(target=_grab_beds, args=(ledger, 2000, 5000, granted)) for _ in range(4)]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert granted.value == 5000
+        assert ledger.reserved[0, 0, 1] == 5000
+        assert ledger.reserved[0, 0, [0, 2]].tolist() == [0, 0]
+    finally:
+        ledger.close()
+
+
+def test_concurrent_allocation_never_exceeds_headroom(tmp_path, predictions):
+    patients = [(HOSPITALS[i % 3], date(2026, 1, 15)) + MILD for i in range(60)]
+    with AllocationService(predictions, snapshot_path=str(tmp_path / "snapshot"), distance_path=DISTANCES,
+                           processes=3) as service:
+        results = service.allocate_many(patients, chunksize=4)
+
+        assigned = [r["Assigned Hospital"] for r in results if r.get("Assigned Hospital")]
+        assert len(assigned) == sum(HEADROOM.values())
+        for hospital, headroom in HEADROOM.items():
+            assert assigned.count(hospital) == headroom
+        reserved = service.reserved("General Bed")[0]
+        positions = service.engine.hospital_positions
+        for hospital, headroom in HEADROOM.items():
+            assert reserved[positions[hospital.lower()]] == headroom
+
+        # Every bed is taken, so the next patient finds nothing until one is given back
+        assert service.allocate(HOSPITALS[0], "2026-01-20", *MILD)["Assigned Hospital"] is None
+        service.release(HOSPITALS[0], "2026-01-01", "General Bed")
+        assert service.reserved("General Bed")[0, positions[HOSPITALS[0].lower()]] == HEADROOM[HOSPITALS[0]] - 1
+        result = service.allocate(HOSPITALS[0], "2026-01-20", *MILD)
+        assert result["Assigned Hospital"] == HOSPITALS[0]
+        # Other months keep their own beds
+        assert service.allocate(HOSPITALS[0], "2026-02-03", *MILD)["Assigned Hospital"] == HOSPITALS[0]
+
+
+def test_release_without_reservation_is_rejected(tmp_path, predictions):
+    with AllocationService(predictions, snapshot_path=str(tmp_path / "snapshot"), distance_path=DISTANCES,
+                           processes=1) as service:
+        with pytest.raises(ValueError):
+            service.release(HOSPITALS[0], "2026-01-01", "General Bed")
+
+
+def test_audit_log_round_trip(tmp_path, predictions):
+    audit_path = str(tmp_path / "audit.bin")
+    engine = AllocationEngine.load(predictions, DISTANCES, rules="score", audit_path=audit_path)
+    engine.allocate(HOSPITALS[0], "2026-01-05", *MILD)
+    engine.allocate(HOSPITALS[2], "2026-02-05", *MILD)
+    # Out-of-range input is clamped instead of stopping the writer
+    engine.allocate(HOSPITALS[0], "2026-01-06", 40, 60, 3_000_000_000, "Negative", "Negative", "Negative")
+    engine.allocate("Nowhere General", "2026-01-07", *MILD)
+    engine.close()
+
+    records = read_audit_log(audit_path)
+    assert len(records) == 4
+    assert records["month"].tolist() == [1, 2, 1, 1]
+    assert records["status"].tolist()[:3] == [OK, OK, OK]
+    assert records["status"][3] != OK
+    assert records["assigned"][0] == engine.hospital_positions[HOSPITALS[0].lower()]
+    # Shishu has no free bed and is rerouted to the nearest hospital that has one
+    assert records["assigned"][1] != records["tried"][1]
+    assert records["hops"][1] > 0
+    assert records["platelet"][2] == np.iinfo(np.int32).max
+    assert os.path.exists(audit_path + ".json")
+
+
+def test_no_capacity_is_audited(tmp_path):
+    predictions = write_predictions(str(tmp_path / "full_predictions_2026_2027_dynamic.parquet"), occupied=(10, 10, 10))
+    audit_path = str(tmp_path / "audit.bin")
+    engine = AllocationEngine.load(predictions, DISTANCES, audit_path=audit_path)
+    assert engine.allocate(HOSPITALS[0], "2026-01-05", *MILD)["Assigned Hospital"] is None
+    engine.close()
+    assert read_audit_log(audit_path)["status"].tolist() == [NO_CAPACITY]
@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from allocation_engine import read_predictions
+from forecasting import save_predictions
+
+
+@pytest.fixture
+def forecast():
+    return pd.DataFrame({"Year": [2026, 2026], "Month": [1, 2], "Hospital": ["DMCH", "DMCH"],
+                         "Beds Occupied": [7.0, 8.0]})
+
+
+@pytest.fixture
+def no_excel(monkeypatch):
+    # Fails the test if read_predictions falls back to parsing the workbook
+    def read_excel(*args, **kwargs):
+        raise AssertionError("workbook was parsed")
+
+    monkeypatch.setattr(pd, "read_excel", read_excel)
+
+
+def test_fresh_run_reads_parquet(tmp_path, forecast, no_excel):
+    stem = str(tmp_path / "rf_predictions_2026_2027_dynamic")
+    assert save_predictions(forecast, stem) == [f"{stem}.parquet", f"{stem}.xlsx"]
+    # The workbook is written first, but the Parquet file must not depend on mtime order
+    assert os.path.getmtime(f"{stem}.parquet") >= os.path.getmtime(f"{stem}.xlsx")
+    pd.testing.assert_frame_equal(read_predictions(f"{stem}.xlsx"), forecast)
+
+
+def test_copied_workbook_still_reads_parquet(tmp_path, forecast, no_excel):
+    # A fresh clone or copy gives both files arbitrary mtimes; the content hash decides
+    stem = str(tmp_path / "rf_predictions_2026_2027_dynamic")
+    save_predictions(forecast, stem)
+    stat = os.stat(f"{stem}.xlsx")
+    os.utime(f"{stem}.xlsx", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10))
+    pd.testing.assert_frame_equal(read_predictions(f"{stem}.xlsx"), forecast)
+
+
+def test_replaced_workbook_is_read(tmp_path, forecast):
+    stem = str(tmp_path / "rf_predictions_2026_2027_dynamic")
+    save_predictions(forecast, stem)
+    edited = forecast.assign(**{"Beds Occupied": [9.0, 9.0]})
+    edited.to_excel(f"{stem}.xlsx", index=False)
+    pd.testing.assert_frame_equal(read_predictions(f"{stem}.xlsx"), edited, check_dtype=False)
+
+
+def test_parquet_only_run_shadows_older_workbook(tmp_path, forecast, no_excel):
+    stem = str(tmp_path / "rf_predictions_2026_2027_dynamic")
+    forecast.assign(**{"Beds Occupied": [1.0, 1.0]}).to_excel(f"{stem}.xlsx", index=False)
+    assert save_predictions(forecast, stem, excel=False) == [f"{stem}.parquet"]
+    pd.testing.assert_frame_equal(read_predictions(f"{stem}.xlsx"), forecast)
+
+
+def test_missing_workbook_reads_parquet(tmp_path, forecast, no_excel):
+    stem = str(tmp_path / "rf_predictions_2026_2027_dynamic")
+    save_predictions(forecast, stem, excel=False)
+    pd.testing.assert_frame_equal(read_predictions(f"{stem}.xlsx"), forecast)
@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from allocation_engine import AllocationEngine
+from allocation_engine import snapshot
+from conftest import DISTANCES, HOSPITALS, write_predictions
+
+
+def test_snapshot_rebuilt_when_source_changes(tmp_path, predictions):
+    snapshot_path = str(tmp_path / "snapshot")
+    AllocationEngine.load(predictions, DISTANCES, snapshot_path=snapshot_path)
+
+    cached = AllocationEngine.load(predictions, DISTANCES, snapshot_path=snapshot_path)
+    assert isinstance(cached.occupied["General Bed"], np.memmap)
+    pos = cached.hospital_positions[HOSPITALS[0].lower()]
+    assert cached.occupied["General Bed"][0, pos] == 7
+
+    write_predictions(predictions, occupied=(9, 8, 10))
+    stat = os.stat(predictions)
+    os.utime(predictions, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    rebuilt = AllocationEngine.load(predictions, DISTANCES, snapshot_path=snapshot_path)
+    assert rebuilt.occupied["General Bed"][0, pos] == 9
+    assert AllocationEngine.from_snapshot(snapshot_path).occupied["General Bed"][0, pos] == 9
+
+
+def _rebuild(engine, path, sources, barrier, rounds):
+    for _ in range(rounds):
+        barrier.wait()
+        snapshot.save_snapshot(engine, path, sources=sources)
+
+
+def test_concurrent_rebuilds_all_succeed(tmp_path, predictions):
+    # A CLI and the Streamlit app rebuilding the same snapshot at once must both finish
+    engine = AllocationEngine.load(predictions, DISTANCES)
+    path = str(tmp_path / "snapshot")
+    sources = snapshot.source_signature(predictions, DISTANCES)
+    barrier = multiprocessing.Barrier(4)
+    writers = [multiprocessing.Process(target=_rebuild, args=(engine, path, sources, barrier, 25)) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert [writer.exitcode for writer in writers] == [0, 0, 0, 0]
+
+    loaded = snapshot.load_snapshot(path, AllocationEngine, sources=sources)
+    pos = loaded.hospital_positions[HOSPITALS[0].lower()]
+    assert loaded.occupied["General Bed"][0, pos] == 7
+    # No temporary directories are left behind
+    assert sorted(os.listdir(tmp_path)) == ["snapshot", os.path.basename(predictions)]
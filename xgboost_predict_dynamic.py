@@ -1,77 +1,62 @@
 import pandas as pd
 import numpy as np
-from xgboost import XGBRegressor
-
-# Load data
-data = pd.read_excel('dataset new cleaned excel.xlsx')
-data['Date'] = pd.to_datetime(data['Date'])
-data['Year'] = data['Date'].dt.year
-data['Month'] = data['Date'].dt.month
-
-# Recalculate occupancy rates
-data['Bed occupancy rate'] = data['Beds Occupied'] / data['Beds Total']
-data['ICU occupancy rate'] = data['ICU Beds Occupied'] / data['ICU Beds Total']
-
-# Target variables and fixed features
-targets = ['Total Admitted till date', 'Admitted Patient in present', 'Beds Occupied',
-           'ICU Beds Occupied', 'Bed occupancy rate', 'ICU occupancy rate']
-fixed_cols = ['Beds Total', 'ICU Beds Total']
-dynamic_features = ['Year', 'Month', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']
-
-hospitals = data['Hospital (DSCC Region)'].unique()
-results = []
 
-for hosp in hospitals:
-    hosp_data = data[data['Hospital (DSCC Region)'] == hosp]
+from allocation_engine.metrics import metrics
+from forecasting import (QUANTILE_TARGETS, QUANTILES, TARGETS, build_training_matrix, load_census, save_predictions,
+                         store_prediction, store_quantiles)
+from forecasting.cli import parse_forecast_args
 
-    # Estimate base month-wise averages for dynamic inputs
-    monthly_avg = hosp_data.groupby('Month')[['Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']].mean().reset_index()
+MODEL = "xgb"
+STAGE = "dengue_forecast_stage_seconds"
+ARGS = parse_forecast_args("XGBoost")
 
-    # Create 2026 base
-    future_2026 = monthly_avg.copy()
-    future_2026['Year'] = 2026
-
-    # Create 2027 as increased by 10%
-    future_2027 = monthly_avg.copy()
-    future_2027[['Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']] *= 1.10
-    future_2027['Year'] = 2027
+# Load data
+with metrics.timer(STAGE, stage="load", model=MODEL):
+    data = load_census('dataset new cleaned excel.xlsx', streaming=ARGS.stream, daily=ARGS.daily)
 
-    # Combine and prepare
-    future_months = pd.concat([future_2026, future_2027], ignore_index=True)
-    future_months['Month'] = list(range(1, 13)) * 2
-    future_months = future_months[['Year', 'Month', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']]
+# Feature/target matrix for every hospital in one vectorized pass
+with metrics.timer(STAGE, stage="features", model=MODEL):
+    matrix = build_training_matrix(data, daily=ARGS.daily)
 
-    predictions = future_months.copy()
+# Model libraries are only imported once there is something to train
+from xgboost import XGBRegressor
 
-    for col in fixed_cols:
-        predictions[col] = hosp_data[col].dropna().iloc[0]
+results = []
 
-    for target in targets:
-        y_train = pd.to_numeric(hosp_data[target], errors='coerce')
-        combined = pd.concat([hosp_data[dynamic_features], y_train.rename('target')], axis=1)
-        combined = combined.dropna().reset_index(drop=True)
+for h, hosp in enumerate(matrix.hospitals):
+    predictions = matrix.future_frame(h)
+    future_X = np.nan_to_num(matrix.future[h], nan=0.0)
 
-        if combined.empty:
+    for t, target in enumerate(TARGETS):
+        X_clean, y_clean = matrix.training_set(h, t)
+        if len(y_clean) == 0:
             predictions[target] = np.nan
+            if target in QUANTILE_TARGETS:
+                store_quantiles(predictions, target, None)
             continue
 
-        X_clean = combined[dynamic_features].astype(float)
-        y_clean = combined['target'].astype(float)
-
         model = XGBRegressor(n_estimators=100, random_state=42)
-        model.fit(X_clean.to_numpy(), y_clean.to_numpy())
+        with metrics.timer(STAGE, stage="fit", model=MODEL):
+            model.fit(X_clean, y_clean)
+
+        with metrics.timer(STAGE, stage="predict", model=MODEL):
+            pred = model.predict(future_X)
 
-        future_X = future_months[X_clean.columns].copy().fillna(0)
-        pred = model.predict(future_X.to_numpy())
+        store_prediction(predictions, target, pred)
 
-        if target in ['Total Admitted till date', 'Admitted Patient in present', 'Beds Occupied', 'ICU Beds Occupied']:
-            predictions[target] = np.clip(np.round(pred), 0, None).astype(int)
-        else:
-            predictions[target] = np.round(pred, 4)
+        # Quantiles from one multi-output model trained with the pinball loss
+        if target in QUANTILE_TARGETS:
+            qmodel = XGBRegressor(n_estimators=100, random_state=42, objective="reg:quantileerror",
+                                  quantile_alpha=np.array(QUANTILES))
+            with metrics.timer(STAGE, stage="quantiles", model=MODEL):
+                qmodel.fit(X_clean, y_clean)
+                store_quantiles(predictions, target, qmodel.predict(future_X).T)
 
     predictions['Hospital'] = hosp
     results.append(predictions)
 
 final_df = pd.concat(results, ignore_index=True)
-final_df.to_excel('xgb_predictions_2026_2027_dynamic.xlsx', index=False)
-print("✅ XGBoost predictions saved as xgb_predictions_2026_2027_dynamic.xlsx")
\ No newline at end of file
+with metrics.timer(STAGE, stage="write", model=MODEL):
+    paths = save_predictions(final_df, 'xgb_daily_predictions_2026_2027_dynamic' if ARGS.daily
+                             else 'xgb_predictions_2026_2027_dynamic', excel=ARGS.excel)
+print(f"✅ XGBoost predictions saved as {' and '.join(paths)}")
\ No newline at end of file